@@ -4,10 +4,11 @@ Controles: w (arriba), s (abajo), a (izquierda), d (derecha), q para salir.
 Objetivo: recoger 3 tesoros y salir por la puerta (E).
 """
 import random
-import os
 import sys
 import time
 
+import numpy as np
+
 WIDTH = 11
 HEIGHT = 9
 NUM_TREASURES = 3
@@ -20,67 +21,73 @@ TREASURE = '$'
 MONSTER = 'M'
 EXIT = 'E'
 
-def clear():
-    # cross-platform clear screen
-    os.system('cls' if os.name == 'nt' else 'clear')
+# el mapa es un array uint8 de códigos; CHARS los traduce al dibujar
+FLOOR_CODE, WALL_CODE, PLAYER_CODE, TREASURE_CODE, MONSTER_CODE, EXIT_CODE = range(6)
+CHARS = FLOOR + WALL + PLAYER + TREASURE + MONSTER + EXIT
+
+_rng = np.random.default_rng()
+
+# escape ANSI para limpiar pantalla (sin fork de shell por frame) y tabla
+# que traduce los códigos uint8 del mapa a sus caracteres de una pasada
+_CLEAR = "\x1b[2J\x1b[H"
+_TRANS = bytes.maketrans(bytes(range(len(CHARS))), CHARS.encode('ascii'))
+_NEWLINE = ord('\n')
 
 def make_empty_map(w, h):
-    grid = [[FLOOR for _ in range(w)] for _ in range(h)]
+    grid = np.full((h, w), FLOOR_CODE, dtype=np.uint8)
     # add border walls
-    for x in range(w):
-        grid[0][x] = WALL
-        grid[h-1][x] = WALL
-    for y in range(h):
-        grid[y][0] = WALL
-        grid[y][w-1] = WALL
-    # add some inner random walls
-    for _ in range((w*h)//12):
-        x = random.randint(1, w-2)
-        y = random.randint(1, h-2)
-        grid[y][x] = WALL
+    grid[0, :] = grid[-1, :] = WALL_CODE
+    grid[:, 0] = grid[:, -1] = WALL_CODE
+    # add some inner random walls (muestreo sin reemplazo, sin colisiones)
+    interior = np.flatnonzero(grid == FLOOR_CODE)
+    walls = _rng.choice(interior, size=(w*h)//12, replace=False)
+    grid.flat[walls] = WALL_CODE
     return grid
 
-def find_free_cell(grid):
-    h = len(grid)
-    w = len(grid[0])
-    while True:
-        x = random.randint(1, w-2)
-        y = random.randint(1, h-2)
-        if grid[y][x] == FLOOR:
-            return x, y
+def find_free_cells(grid, k):
+    # k celdas FLOOR distintas de una tirada, sin rejection sampling
+    free = np.flatnonzero(grid == FLOOR_CODE)
+    picks = _rng.choice(free, size=k, replace=False)
+    ys, xs = np.unravel_index(picks, grid.shape)
+    return [(int(x), int(y)) for x, y in zip(xs, ys)]
 
 def place_items(grid):
-    treasures = []
-    monsters = []
-    for _ in range(NUM_TREASURES):
-        treasures.append(find_free_cell(grid))
-    for _ in range(NUM_MONSTERS):
-        monsters.append(find_free_cell(grid))
-    exit_pos = find_free_cell(grid)
-    player_pos = find_free_cell(grid)
+    # sets: membership y borrado O(1) al pisar tesoros/monstruos
+    cells = find_free_cells(grid, NUM_TREASURES + NUM_MONSTERS + 2)
+    treasures = set(cells[:NUM_TREASURES])
+    monsters = set(cells[NUM_TREASURES:NUM_TREASURES + NUM_MONSTERS])
+    exit_pos = cells[-2]
+    player_pos = cells[-1]
     return player_pos, treasures, monsters, exit_pos
 
-def draw(grid, player, treasures, monsters, exit_pos, hp, score, moves):
-    clear()
-    h = len(grid)
-    w = len(grid[0])
-    # make a copy for display
-    disp = [row[:] for row in grid]
-    ex = exit_pos
-    disp[ex[1]][ex[0]] = EXIT
-    for tx,ty in treasures:
-        disp[ty][tx] = TREASURE
-    for mx,my in monsters:
-        disp[my][mx] = MONSTER
-    px,py = player
-    disp[py][px] = PLAYER
-    print("Mini Dungeon  — recoge {} tesoros y sal por la E".format(NUM_TREASURES))
-    print("HP: {}  |  Tesoros: {}  |  Movimientos: {}".format(hp, score, moves))
-    print()
-    for row in disp:
-        print(''.join(row))
-    print()
-    print("Controles: w/a/s/d mover, q salir")
+def make_board_buf(grid):
+    # buffer de dibujo persistente: el mapa + una columna '\n'; se crea una
+    # vez por partida y draw lo retoca in situ en vez de copiar el grid
+    h, w = grid.shape
+    buf = np.full((h, w + 1), _NEWLINE, dtype=np.uint8)
+    buf[:, :w] = grid
+    return buf
+
+def draw(board, player, treasures, monsters, exit_pos, hp, score, moves):
+    # overlay disperso: guardar las celdas pisadas, escribir, emitir, restaurar
+    overlays = [(exit_pos, EXIT_CODE)]
+    overlays += [(t, TREASURE_CODE) for t in treasures]
+    overlays += [(m, MONSTER_CODE) for m in monsters]
+    overlays.append((player, PLAYER_CODE))
+    saved = [(x, y, board[y, x]) for (x, y), _ in overlays]
+    for (x, y), code in overlays:
+        board[y, x] = code
+    # todo el frame (clear + cabecera + mapa + pie) sale en UN solo write;
+    # el mapa se traduce código->caracter con bytes.translate
+    frame = (_CLEAR
+             + "Mini Dungeon  — recoge {} tesoros y sal por la E\n".format(NUM_TREASURES)
+             + "HP: {}  |  Tesoros: {}  |  Movimientos: {}\n\n".format(hp, score, moves)
+             + board.tobytes().translate(_TRANS).decode('ascii')
+             + "\nControles: w/a/s/d mover, q salir\n")
+    sys.stdout.buffer.write(frame.encode('utf-8'))
+    sys.stdout.flush()
+    for x, y, code in saved:
+        board[y, x] = code
 
 def move_pos(pos, direction):
     x,y = pos
@@ -92,7 +99,8 @@ def move_pos(pos, direction):
 
 def in_bounds(grid, pos):
     x,y = pos
-    return 0 <= y < len(grid) and 0 <= x < len(grid[0])
+    h, w = grid.shape
+    return 0 <= y < h and 0 <= x < w
 
 def fight_monster(hp):
     # simple fight: 50% win chance, if lose - lose HP
@@ -111,12 +119,13 @@ def main():
     random.seed()
     grid = make_empty_map(WIDTH, HEIGHT)
     player, treasures, monsters, exit_pos = place_items(grid)
+    board = make_board_buf(grid)
     hp = 6
     score = 0
     moves = 0
 
     while True:
-        draw(grid, player, treasures, monsters, exit_pos, hp, score, moves)
+        draw(board, player, treasures, monsters, exit_pos, hp, score, moves)
         if hp <= 0:
             print("Has muerto. Game over.")
             break
@@ -142,7 +151,7 @@ def main():
             time.sleep(0.2)
             continue
         nx, ny = newp
-        if grid[ny][nx] == WALL:
+        if grid[ny, nx] == WALL_CODE:
             print("Hay una pared ahí.")
             time.sleep(0.2)
             continue
@@ -154,7 +163,7 @@ def main():
             print(message)
             time.sleep(0.6)
             if win:
-                monsters.remove((nx,ny))
+                monsters.discard((nx,ny))
             else:
                 # if still alive, monster remains; if hp <=0 loop will end next
                 pass
@@ -167,7 +176,7 @@ def main():
 
         # check treasure
         if player in treasures:
-            treasures.remove(player)
+            treasures.discard(player)
             score += 1
             print("Encontraste un tesoro! ({}/{})".format(score, NUM_TREASURES))
             time.sleep(0.6)
@@ -1,459 +1,785 @@
-"""
-PixelLife Evolution Simulator
-Autor: Andrés (adaptado por ChatGPT)
-Descripción:
-- Mundo de celdas (grid). Cada celda puede tener 0 o 1 individuo.
-- Individuos tienen genoma simple (RGB color + fuerza, movilidad, cooperacion, give_way).
-- Se mueven, pelean, se reproducen, mutan, consumen energía.
-- Estadísticas en pantalla (especie dominante por color, poblacion, avg fuerza, mutaciones).
-Controles:
-- SPACE : pausa / resume
-- R     : reset
-- S     : guardar screenshot (exporta png)
-- +/-   : velocidad (ticks por frame)
-- M     : alterna mostrar estadísticas detalladas
-"""
-
-import pygame, random, math, time
-from collections import defaultdict, Counter
-
-# ========== Config ==========
-WINDOW_W, WINDOW_H = 800, 600
-GRID_W, GRID_H = 200, 150            # grid cells
-CELL_SIZE = max(1, min(8, WINDOW_W // GRID_W))  # cell size (auto)
-FPS = 60
-INITIAL_FILL = 0.12                  # fraction of cells initially occupied
-TICK_PER_FRAME = 1
-
-# Genetic / simulation tuning
-BASE_ENERGY = 100
-MOVE_COST = 1
-REPRODUCE_COST = 30
-ATTACK_COST = 5
-ENERGY_GAIN_ON_KILL = 40
-MUTATION_RATE = 0.08                 # chance per gene to mutate
-MUTATION_MAG = 0.12                  # mutation magnitude (fractional)
-MIN_ENERGY_TO_REPRODUCE = 80
-MAX_AGE = 9999
-
-SHOW_STATS = True
-
-# ========== Helpers ==========
-def clamp(v, a, b): return max(a, min(b, v))
-def mix(a, b): return (a + b) / 2.0
-
-def color_to_gene(rgb):
-    # convert 0-255 rgb to 0-1 floats in genome
-    return [c / 255.0 for c in rgb]
-
-def gene_to_color(g):
-    return (int(clamp(g[0],0,1)*255), int(clamp(g[1],0,1)*255), int(clamp(g[2],0,1)*255))
-
-def mutate_value(x, mag):
-    # x in 0..1, mag fraction
-    delta = random.uniform(-mag, mag)
-    return clamp(x + delta, 0.0, 1.0)
-
-# ========== Agent ==========
-class Agent:
-    __slots__ = ("x","y","r","g","b","strength","mobility","cooperation","give_way","energy","age","id")
-    _id_counter = 0
-    def __init__(self, x,y, genome=None):
-        self.x = x; self.y = y
-        Agent._id_counter += 1
-        self.id = Agent._id_counter
-        if genome:
-            self.r,self.g,self.b = genome["r"],genome["g"],genome["b"]
-            self.strength = genome["strength"]
-            self.mobility = genome["mobility"]
-            self.cooperation = genome["cooperation"]
-            self.give_way = genome["give_way"]
-        else:
-            # random init
-            self.r,self.g,self.b = random.random(), random.random(), random.random()
-            self.strength = random.random()
-            self.mobility = random.random()
-            self.cooperation = random.random()
-            self.give_way = random.random()*0.5  # giving way less common
-        self.energy = BASE_ENERGY * (0.6 + random.random()*0.8)
-        self.age = 0
-
-    def genome(self):
-        return {
-            "r": self.r, "g": self.g, "b": self.b,
-            "strength": self.strength,
-            "mobility": self.mobility,
-            "cooperation": self.cooperation,
-            "give_way": self.give_way
-        }
-
-    def color(self):
-        return gene_to_color((self.r,self.g,self.b))
-
-    def step_energy_cost(self):
-        # energy used each tick, depends on mobility and strength
-        return 0.2 + self.mobility*0.5 + self.strength*0.3
-
-    def try_mutate(self):
-        # mutate all genes with some probability
-        changed = False
-        if random.random() < MUTATION_RATE:
-            self.r = mutate_value(self.r, MUTATION_MAG); changed = True
-        if random.random() < MUTATION_RATE:
-            self.g = mutate_value(self.g, MUTATION_MAG); changed = True
-        if random.random() < MUTATION_RATE:
-            self.b = mutate_value(self.b, MUTATION_MAG); changed = True
-        if random.random() < MUTATION_RATE:
-            self.strength = clamp(self.strength + random.uniform(-MUTATION_MAG, MUTATION_MAG), 0.0, 1.0); changed = True
-        if random.random() < MUTATION_RATE:
-            self.mobility = clamp(self.mobility + random.uniform(-MUTATION_MAG, MUTATION_MAG), 0.0, 1.0); changed = True
-        if random.random() < MUTATION_RATE:
-            self.cooperation = clamp(self.cooperation + random.uniform(-MUTATION_MAG, MUTATION_MAG), 0.0, 1.0); changed = True
-        if random.random() < MUTATION_RATE:
-            self.give_way = clamp(self.give_way + random.uniform(-MUTATION_MAG, MUTATION_MAG), 0.0, 1.0); changed = True
-        return changed
-
-# ========== World ==========
-class World:
-    def __init__(self, w, h, fill=INITIAL_FILL):
-        self.w, self.h = w, h
-        self.grid = [[None for _ in range(h)] for __ in range(w)]
-        self.agents = []
-        self.tick = 0
-        self.recent_mutations = 0
-        self.event_log = []
-        self.populate_random(fill)
-
-    def pos_in_bounds(self, x,y):
-        return 0 <= x < self.w and 0 <= y < self.h
-
-    def populate_random(self, fill):
-        self.grid = [[None for _ in range(self.h)] for __ in range(self.w)]
-        self.agents.clear()
-        for x in range(self.w):
-            for y in range(self.h):
-                if random.random() < fill:
-                    a = Agent(x,y)
-                    self.grid[x][y] = a
-                    self.agents.append(a)
-
-    def clear(self):
-        self.grid = [[None for _ in range(self.h)] for __ in range(self.w)]
-        self.agents.clear()
-
-    def neighbors(self, x,y):
-        dirs = [(-1,0),(1,0),(0,-1),(0,1),(-1,-1),(1,1),(-1,1),(1,-1)]
-        for dx,dy in dirs:
-            nx,ny = x+dx,y+dy
-            if self.pos_in_bounds(nx,ny):
-                yield nx,ny
-
-    def step(self):
-        self.tick += 1
-        self.recent_mutations = 0
-        random.shuffle(self.agents)  # randomize order to avoid bias
-        to_remove = []
-        to_add = []
-        for agent in list(self.agents):
-            # Skip agents that may have died earlier in this tick
-            if agent.energy <= 0:
-                if agent not in to_remove:
-                    to_remove.append(agent)
-                continue
-
-            # base aging and metabolism
-            agent.age += 1
-            agent.energy -= agent.step_energy_cost()
-            if agent.energy <= 0:
-                to_remove.append(agent)
-                continue
-
-            # Decide whether to move
-            if random.random() < agent.mobility:
-                # choose a target neighbor (including staying chance)
-                choices = [(agent.x, agent.y)] + list(self.neighbors(agent.x, agent.y))
-                tx,ty = random.choice(choices)
-                if (tx,ty) == (agent.x, agent.y):
-                    pass
-                else:
-                    occupant = self.grid[tx][ty]
-                    if occupant is None:
-                        # move
-                        self.grid[agent.x][agent.y] = None
-                        agent.x, agent.y = tx,ty
-                        self.grid[tx][ty] = agent
-                        agent.energy -= MOVE_COST
-                    else:
-                        # interaction: decide give way or fight or reproduce
-                        # if one gives way, swap or stay
-                        if random.random() < agent.give_way:
-                            # agent gives way: stays and loses small energy
-                            agent.energy -= 0.5
-                        elif random.random() < occupant.give_way:
-                            # occupant gives way -> occupant moves away if possible
-                            moved = False
-                            for nx,ny in self.neighbors(occupant.x, occupant.y):
-                                if self.grid[nx][ny] is None:
-                                    self.grid[occupant.x][occupant.y] = None
-                                    occupant.x, occupant.y = nx,ny
-                                    self.grid[nx][ny] = occupant
-                                    moved = True
-                                    break
-                            # now move agent into freed cell if freed
-                            if moved and self.grid[tx][ty] is None:
-                                self.grid[agent.x][agent.y] = None
-                                agent.x, agent.y = tx,ty
-                                self.grid[tx][ty] = agent
-                                agent.energy -= MOVE_COST
-                        else:
-                            # fight or reproduce depending on cooperation and compatibility
-                            compat = color_similarity(agent, occupant)
-                            if random.random() < (agent.cooperation * occupant.cooperation * compat):
-                                # reproduce (create child in a nearby empty cell if possible)
-                                empty = None
-                                for nx,ny in self.neighbors(agent.x, agent.y):
-                                    if self.grid[nx][ny] is None:
-                                        empty = (nx,ny); break
-                                if empty:
-                                    child = reproduce(agent, occupant, empty[0], empty[1])
-                                    to_add.append(child)
-                                    agent.energy -= REPRODUCE_COST
-                                    occupant.energy -= REPRODUCE_COST/1.5
-                                    # small chance of mutation
-                                    if child.try_mutate():
-                                        self.recent_mutations += 1
-                                else:
-                                    # no space -> fight instead
-                                    if fight(agent, occupant):
-                                        # agent wins -> occupant dies
-                                        to_remove.append(occupant)
-                                        agent.energy += ENERGY_GAIN_ON_KILL
-                                    else:
-                                        to_remove.append(agent)
-                            else:
-                                # fight: chance proportional to strength + energy
-                                if fight(agent, occupant):
-                                    to_remove.append(occupant)
-                                    agent.energy += ENERGY_GAIN_ON_KILL
-                                else:
-                                    to_remove.append(agent)
-
-            # death by age (optional)
-            if agent.age > MAX_AGE:
-                to_remove.append(agent)
-
-        # apply removals and additions
-        for dead in to_remove:
-            try:
-                if self.grid[dead.x][dead.y] is dead:
-                    self.grid[dead.x][dead.y] = None
-            except Exception:
-                pass
-            if dead in self.agents:
-                self.agents.remove(dead)
-        for child in to_add:
-            if self.grid[child.x][child.y] is None:
-                self.grid[child.x][child.y] = child
-                self.agents.append(child)
-
-        # occasional global events
-        if self.tick % 2000 == 0:
-            # small random event: starvation or small meteor
-            if random.random() < 0.5:
-                self.event_log.append(f"{self.tick}: Meteoro - zona afectada")
-                self._meteor_event()
-            else:
-                self.event_log.append(f"{self.tick}: Sequía - energía reducida temporalmente")
-                self._drought_event()
-
-    def _meteor_event(self):
-        # kill random patch
-        cx = random.randrange(self.w); cy = random.randrange(self.h)
-        radius = random.randint(3, 12)
-        killed = 0
-        for x in range(max(0,cx-radius), min(self.w, cx+radius+1)):
-            for y in range(max(0,cy-radius), min(self.h, cy+radius+1)):
-                if self.grid[x][y]:
-                    killed += 1
-                    try:
-                        self.agents.remove(self.grid[x][y])
-                    except ValueError:
-                        pass
-                    self.grid[x][y] = None
-        self.event_log.append(f"  {killed} individuos muertos por meteoro")
-
-    def _drought_event(self):
-        # reduce everyone's energy a bit
-        for a in self.agents:
-            a.energy -= random.uniform(5,20)
-
-    def count_species_by_color(self, bucket=8):
-        # bucketize colors to find dominant tones
-        ctr = Counter()
-        for a in self.agents:
-            key = (int(a.r*bucket), int(a.g*bucket), int(a.b*bucket))
-            ctr[key] += 1
-        if not ctr: return None,0
-        k,c = ctr.most_common(1)[0]
-        # approximate color back
-        return (int(k[0]*255/(bucket-1 if bucket>1 else 1)),
-                int(k[1]*255/(bucket-1 if bucket>1 else 1)),
-                int(k[2]*255/(bucket-1 if bucket>1 else 1))), c
-
-# ========== Interaction functions ==========
-def color_similarity(a,b):
-    # cosine similarity between color vectors
-    da = (a.r, a.g, a.b)
-    db = (b.r, b.g, b.b)
-    dot = da[0]*db[0] + da[1]*db[1] + da[2]*db[2]
-    mag_a = math.sqrt(da[0]*da[0]+da[1]*da[1]+da[2]*da[2]) + 1e-9
-    mag_b = math.sqrt(db[0]*db[0]+db[1]*db[1]+db[2]*db[2]) + 1e-9
-    return clamp(dot/(mag_a*mag_b), 0.0, 1.0)
-
-def fight(a,b):
-    # returns True if 'a' wins against 'b'
-    score_a = a.strength*1.5 + (a.energy / (BASE_ENERGY*1.5))
-    score_b = b.strength*1.5 + (b.energy / (BASE_ENERGY*1.5))
-    prob_a = score_a / (score_a + score_b + 1e-9)
-    # small randomness
-    return random.random() < prob_a
-
-def reproduce(a,b, x,y):
-    # create child genome as averages + slight random noise
-    child = Agent(x,y, genome={
-        "r": mix(a.r,b.r),
-        "g": mix(a.g,b.g),
-        "b": mix(a.b,b.b),
-        "strength": mix(a.strength, b.strength),
-        "mobility": mix(a.mobility, b.mobility),
-        "cooperation": mix(a.cooperation, b.cooperation),
-        "give_way": mix(a.give_way, b.give_way),
-    })
-    # child initial energy smaller
-    child.energy = (a.energy + b.energy) * 0.15
-    return child
-
-# ========== Rendering / UI ==========
-def draw_world(screen, world):
-    # draw agents as colored rects (pixels/cells)
-    for x in range(world.w):
-        col = world.grid[x]
-        for y in range(world.h):
-            a = col[y]
-            if a:
-                rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                screen.fill(a.color(), rect)
-
-def draw_overlay(screen, world, font, paused, speed, show_detailed):
-    # stats box
-    surf = pygame.Surface((320, 140))
-    surf.set_alpha(200)
-    surf.fill((20,20,20))
-    screen.blit(surf, (8,8))
-    small = font
-    lines = []
-    lines.append(f"Tick: {world.tick}   Agents: {len(world.agents)}  Speed: {speed}x")
-    dom_color, dom_count = world.count_species_by_color()
-    if dom_color:
-        lines.append(f"Dominant color count: {dom_count}")
-    else:
-        lines.append("Dominant color: -")
-    # averages
-    if world.agents:
-        avg_str = sum(a.strength for a in world.agents)/len(world.agents)
-        avg_mob = sum(a.mobility for a in world.agents)/len(world.agents)
-        avg_coop= sum(a.cooperation for a in world.agents)/len(world.agents)
-    else:
-        avg_str=avg_mob=avg_coop=0
-    lines.append(f"Avg strength: {avg_str:.2f}  mobility: {avg_mob:.2f}")
-    lines.append(f"Avg cooperation: {avg_coop:.2f}  recent mutations: {world.recent_mutations}")
-    if paused:
-        lines.append("PAUSED (SPACE to resume)")
-    else:
-        lines.append("Running (SPACE to pause)")
-    if show_detailed:
-        # top species colors histogram (bucket)
-        ctr = Counter()
-        for a in world.agents:
-            key = (int(a.r*6), int(a.g*6), int(a.b*6))
-            ctr[key] += 1
-        top = ctr.most_common(5)
-        for k,c in top:
-            # decode approx color
-            col = (int(k[0]*255/6), int(k[1]*255/6), int(k[2]*255/6))
-            lines.append(f"color {col} : {c}")
-    # render lines
-    y = 12
-    for L in lines:
-        surf_text = small.render(L, True, (230,230,230))
-        screen.blit(surf_text, (12, 12 + y))
-        y += 18
-    # draw dominant color box
-    if dom_color:
-        pygame.draw.rect(screen, dom_color, pygame.Rect(8+320-36, 8+12, 28, 28))
-    # events on bottom-left
-    e_y = WINDOW_H - 64
-    for e in world.event_log[-4:]:
-        ev_surf = small.render(e, True, (220,200,200))
-        screen.blit(ev_surf, (10, e_y))
-        e_y += 16
-
-# ========== Main ==========
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
-    pygame.display.set_caption("PixelLife Evolution Simulator")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("consolas", 14)
-
-    world = World(GRID_W, GRID_H)
-    paused = False
-    speed = 1
-    show_detailed = False
-
-    last_screenshot = 0
-
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    paused = not paused
-                elif event.key == pygame.K_r:
-                    world = World(GRID_W, GRID_H)
-                elif event.key == pygame.K_s:
-                    # screenshot
-                    fname = f"pixellife_screenshot_{int(time.time())}.png"
-                    pygame.image.save(screen, fname)
-                    last_screenshot = time.time()
-                    print(f"Saved screenshot: {fname}")
-                elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
-                    speed = min(8, speed+1)
-                elif event.key == pygame.K_MINUS:
-                    speed = max(1, speed-1)
-                elif event.key == pygame.K_m:
-                    show_detailed = not show_detailed
-
-        if not paused:
-            for _ in range(speed):
-                world.step()
-
-        # draw background (dark)
-        screen.fill((8,8,9))
-
-        draw_world(screen, world)
-        draw_overlay(screen, world, font, paused, speed, show_detailed)
-
-        # small footer
-        footer = font.render("SPACE pause | R reset | S screenshot | +/- speed | M toggle details", True, (120,120,120))
-        screen.blit(footer, (8, WINDOW_H-22))
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    pygame.quit()
-
-if __name__ == "__main__":
-    main()
+"""
+PixelLife Evolution Simulator
+Autor: Andrés (adaptado por ChatGPT)
+Descripción:
+- Mundo de celdas (grid). Cada celda puede tener 0 o 1 individuo.
+- Individuos tienen genoma simple (RGB color + fuerza, movilidad, cooperacion, give_way).
+- Se mueven, pelean, se reproducen, mutan, consumen energía.
+- Estado en formato SoA: el grid es un array int32 de indices y cada gen
+  vive en su propia columna NumPy; Agent es solo una vista sobre un slot.
+- Estadísticas en pantalla (especie dominante por color, poblacion, avg fuerza, mutaciones).
+Controles:
+- SPACE : pausa / resume
+- R     : reset
+- S     : guardar screenshot (exporta png)
+- +/-   : velocidad (ticks por frame)
+- M     : alterna mostrar estadísticas detalladas
+"""
+
+import pygame, random, math, time
+import numpy as np
+from collections import defaultdict, Counter
+
+try:
+    from numba import njit
+except ImportError:
+    # sin numba el kernel corre igual en Python puro, solo mucho más lento
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def deco(f):
+            return f
+        return deco
+
+# GPU opcional (experimental): con CUDA disponible y USE_GPU=True el loop de
+# interacción corre en un kernel cuda.jit, un thread por agente. Solo renta
+# en mundos mucho más grandes que el default; el kernel CPU sigue siendo el
+# camino normal.
+USE_GPU = False
+try:
+    from numba import cuda
+    from numba.cuda.random import (create_xoroshiro128p_states,
+                                   xoroshiro128p_uniform_float32)
+    _HAS_CUDA = cuda.is_available()
+except Exception:
+    _HAS_CUDA = False
+
+# ========== Config ==========
+WINDOW_W, WINDOW_H = 800, 600
+GRID_W, GRID_H = 200, 150            # grid cells
+CELL_SIZE = max(1, min(8, WINDOW_W // GRID_W))  # cell size (auto)
+FPS = 60
+INITIAL_FILL = 0.12                  # fraction of cells initially occupied
+TICK_PER_FRAME = 1
+
+# Genetic / simulation tuning
+BASE_ENERGY = 100
+MOVE_COST = 1
+REPRODUCE_COST = 30
+ATTACK_COST = 5
+ENERGY_GAIN_ON_KILL = 40
+MUTATION_RATE = 0.08                 # chance per gene to mutate
+MUTATION_MAG = 0.12                  # mutation magnitude (fractional)
+MIN_ENERGY_TO_REPRODUCE = 80
+MAX_AGE = 9999
+
+SHOW_STATS = True
+
+# ========== Helpers ==========
+def clamp(v, a, b): return max(a, min(b, v))
+def mix(a, b): return (a + b) / 2.0
+
+def color_to_gene(rgb):
+    # convert 0-255 rgb to 0-1 floats in genome
+    return [c / 255.0 for c in rgb]
+
+def gene_to_color(g):
+    return (int(clamp(g[0],0,1)*255), int(clamp(g[1],0,1)*255), int(clamp(g[2],0,1)*255))
+
+def mutate_value(x, mag):
+    # x in 0..1, mag fraction
+    delta = random.uniform(-mag, mag)
+    return clamp(x + delta, 0.0, 1.0)
+
+# vecindario 8-conexo para el kernel; el índice 0 es "quedarse quieto"
+DX = np.array([0,-1,1,0,0,-1,1,-1,1], dtype=np.int32)
+DY = np.array([0,0,0,-1,1,-1,1,1,-1], dtype=np.int32)
+
+# ========== Agent ==========
+GENE_NAMES = ("r","g","b","strength","mobility","cooperation","give_way")
+# columnas de World.traits: 7 genes + energía en una fila float32 de 32 bytes
+R, G, B, STR, MOB, COOP, GIV, ENE = range(8)
+
+class Agent:
+    """Vista ligera sobre un slot del mundo: los datos reales viven en
+    las columnas SoA de World, aquí solo guardamos (world, id)."""
+    __slots__ = ("world","id")
+    _COLS = ("x","y","energy","age") + GENE_NAMES
+
+    def __init__(self, world, slot):
+        object.__setattr__(self, "world", world)
+        object.__setattr__(self, "id", slot)
+
+    def __getattr__(self, name):
+        if name in Agent._COLS:
+            return getattr(self.world, name)[self.id]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in Agent._COLS:
+            getattr(self.world, name)[self.id] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def genome(self):
+        return {k: float(getattr(self, k)) for k in GENE_NAMES}
+
+    def color(self):
+        cr, cg, cb = self.world.color_u8[self.id]
+        return (int(cr), int(cg), int(cb))
+
+    def step_energy_cost(self):
+        # energy used each tick, depends on mobility and strength (memoizado)
+        return float(self.world.step_cost[self.id])
+
+    def try_mutate(self):
+        # mutate all genes with some probability
+        changed = False
+        for gene in GENE_NAMES:
+            if random.random() < MUTATION_RATE:
+                setattr(self, gene, mutate_value(getattr(self, gene), MUTATION_MAG))
+                changed = True
+        if changed:
+            # mantener coherentes los caches derivados del genoma
+            w, i = self.world, self.id
+            w.color_u8[i] = (w.traits[i, :3]*255).astype(np.uint8)
+            w.step_cost[i] = 0.2 + 0.5*w.traits[i, MOB] + 0.3*w.traits[i, STR]
+        return changed
+
+# ========== World ==========
+class World:
+    def __init__(self, w, h, fill=INITIAL_FILL):
+        self.w, self.h = w, h
+        self.max_agents = w * h          # una celda = un agente como mucho
+        # grid[x,y] = slot id del ocupante, o -1 si vacía
+        self.grid = np.full((w, h), -1, dtype=np.int32)
+        # estado por slot id: genoma+energía empaquetados (SoA por fuera,
+        # fila AoS de 32B por dentro: todo el agente cabe en una cache line)
+        self.traits = np.zeros((self.max_agents, 8), dtype=np.float32)
+        # vistas por columna, para seguir accediendo por nombre
+        self.r = self.traits[:, R]
+        self.g = self.traits[:, G]
+        self.b = self.traits[:, B]
+        self.strength = self.traits[:, STR]
+        self.mobility = self.traits[:, MOB]
+        self.cooperation = self.traits[:, COOP]
+        self.give_way = self.traits[:, GIV]
+        self.energy = self.traits[:, ENE]
+        # posición y edad aparte (otro patrón de acceso y dtypes mínimos:
+        # int16 cubre cualquier grid razonable, uint16 > MAX_AGE)
+        self.x = np.zeros(self.max_agents, dtype=np.int16)
+        self.y = np.zeros(self.max_agents, dtype=np.int16)
+        self.age = np.zeros(self.max_agents, dtype=np.uint16)
+        self.alive = np.zeros(self.max_agents, dtype=bool)
+        # colores normalizados (para similitud coseno sin sqrt en el kernel)
+        self.rgb_norm = np.zeros((self.max_agents, 3), dtype=np.float32)
+        # color ya cuantizado a uint8 por slot; se recalcula solo cuando el
+        # rgb cambia (nacimiento/mutación), el render lo consume tal cual
+        self.color_u8 = np.zeros((self.max_agents, 3), dtype=np.uint8)
+        # coste metabólico por tick, memoizado: solo depende de movilidad y
+        # fuerza, así que se recalcula únicamente al nacer o mutar
+        self.step_cost = np.zeros(self.max_agents, dtype=np.float32)
+        self.free = []                   # slots muertos, se reutilizan al nacer
+        self.n_slots = 0                 # marca de agua de slots usados
+        # PCG64: mucho más barato que random.* del stdlib y permite sacar
+        # toda la aleatoriedad de un tick en tandas vectorizadas
+        self._rng = np.random.default_rng()
+        # bbox (minx, miny, maxx, maxy) de celdas cambiadas desde el último
+        # frame, para display.update parcial; vacío = (w, h, -1, -1)
+        self._dirty = np.array([w, h, -1, -1], dtype=np.int32)
+        self._gpu_rng = None             # estados xoroshiro, creados al usar GPU
+        self.tick = 0
+        self.recent_mutations = 0
+        self.event_log = []
+        self.populate_random(fill)
+
+    @property
+    def agents(self):
+        # vistas ligeras, útil para UI / stats; no usar en el hot loop
+        return [Agent(self, int(i)) for i in np.flatnonzero(self.alive)]
+
+    def pos_in_bounds(self, x,y):
+        return 0 <= x < self.w and 0 <= y < self.h
+
+    def populate_random(self, fill):
+        self.clear()
+        mask = self._rng.random((self.w, self.h)) < fill
+        idx = np.flatnonzero(mask)
+        n = len(idx)
+        self.grid.flat[idx] = np.arange(n, dtype=np.int32)
+        self.x[:n], self.y[:n] = np.unravel_index(idx, (self.w, self.h))
+        self.traits[:n, R:GIV+1] = self._rng.random((n, 7))
+        self.give_way[:n] *= 0.5  # giving way less common
+        self.color_u8[:n] = (self.traits[:n, :3]*255).astype(np.uint8)
+        self.step_cost[:n] = 0.2 + 0.5*self.mobility[:n] + 0.3*self.strength[:n]
+        self.energy[:n] = BASE_ENERGY * (0.6 + self._rng.random(n) * 0.8)
+        self.age[:n] = 0
+        self.alive[:n] = True
+        self.n_slots = n
+
+    def clear(self):
+        self.grid.fill(-1)
+        self.alive[:] = False
+        self.free.clear()
+        self.n_slots = 0
+        self._dirty[:] = (0, 0, self.w - 1, self.h - 1)
+
+    def _mark_dirty(self, x, y):
+        d = self._dirty
+        if x < d[0]: d[0] = x
+        if y < d[1]: d[1] = y
+        if x > d[2]: d[2] = x
+        if y > d[3]: d[3] = y
+
+    def consume_dirty(self):
+        # devuelve el bbox en celdas de lo cambiado (o None) y lo resetea
+        x0, y0, x1, y1 = self._dirty
+        if x1 < 0:
+            return None
+        self._dirty[:] = (self.w, self.h, -1, -1)
+        return int(x0), int(y0), int(x1), int(y1)
+
+    def spawn(self, x, y, genome=None):
+        # ocupa un slot libre (o abre uno nuevo) y devuelve su id
+        if self.free:
+            i = self.free.pop()
+        else:
+            i = self.n_slots
+            self.n_slots += 1
+        self.x[i] = x; self.y[i] = y
+        if genome is not None:
+            self.traits[i, :ENE] = genome
+        else:
+            # random init
+            self.traits[i, :ENE] = self._rng.random(7)
+            self.traits[i, GIV] *= 0.5
+        self.color_u8[i] = (self.traits[i, :3]*255).astype(np.uint8)
+        self.step_cost[i] = 0.2 + 0.5*self.traits[i, MOB] + 0.3*self.traits[i, STR]
+        self.energy[i] = BASE_ENERGY * (0.6 + self._rng.random()*0.8)
+        self.age[i] = 0
+        self.alive[i] = True
+        self.grid[x, y] = i
+        self._mark_dirty(x, y)
+        return i
+
+    def kill(self, i):
+        if not self.alive[i]:
+            return
+        if self.grid[self.x[i], self.y[i]] == i:
+            self.grid[self.x[i], self.y[i]] = -1
+            self._mark_dirty(int(self.x[i]), int(self.y[i]))
+        self.alive[i] = False
+        self.free.append(int(i))
+
+    def step(self):
+        self.tick += 1
+        self.recent_mutations = 0
+        grid = self.grid
+        ids = np.flatnonzero(self.alive)
+        # base aging and metabolism, una pasada vectorizada por tick
+        self.age[ids] += 1
+        self.energy[ids] -= self.step_cost[ids]
+        starved = self.energy[ids] <= 0
+        dead = np.zeros(self.max_agents, dtype=np.bool_)
+        dead[ids[starved]] = True
+        order = ids[~starved]
+        self._rng.shuffle(order)  # randomize order to avoid bias
+
+        # normales de color, una pasada por tick: la similitud en el kernel
+        # queda en un producto punto sin sqrt
+        n = self.n_slots
+        norms = np.sqrt(self.r[:n]**2 + self.g[:n]**2 + self.b[:n]**2) + 1e-9
+        self.rgb_norm[:n, 0] = self.r[:n] / norms
+        self.rgb_norm[:n, 1] = self.g[:n] / norms
+        self.rgb_norm[:n, 2] = self.b[:n] / norms
+
+        # el loop de interacción corre compilado; los nacimientos salen en
+        # buffers preasignados (como mucho un hijo por agente que actúa)
+        cap = max(1, order.size)
+        birth_pos = np.empty((cap, 2), dtype=np.int32)
+        birth_parents = np.empty((cap, 2), dtype=np.int32)
+        birth_energy = np.empty(cap)
+        if USE_GPU and _HAS_CUDA and order.size:
+            n_births = self._step_interactions_gpu(order, dead, birth_pos,
+                                                   birth_parents, birth_energy)
+        else:
+            n_births = step_core(grid, self.x, self.y, self.rgb_norm,
+                                 self.strength, self.mobility, self.cooperation,
+                                 self.give_way, self.energy, self.age,
+                                 order, dead, birth_pos, birth_parents, birth_energy,
+                                 self._dirty)
+
+        # apply removals and additions
+        for d in np.flatnonzero(dead):
+            self.kill(int(d))
+        child_ids = []
+        for bi in range(n_births):
+            cx, cy = int(birth_pos[bi, 0]), int(birth_pos[bi, 1])
+            if grid[cx, cy] < 0:
+                ci = self.spawn(cx, cy, mix_genome(self, int(birth_parents[bi, 0]),
+                                                   int(birth_parents[bi, 1])))
+                # child initial energy smaller
+                self.energy[ci] = float(birth_energy[bi])
+                child_ids.append(ci)
+        # small chance of mutation: diferida y vectorizada sobre toda la
+        # camada del tick (bernoulli por gen + delta, en dos ops NumPy)
+        if child_ids:
+            cids = np.asarray(child_ids)
+            k = len(GENE_NAMES)
+            mask = self._rng.random((cids.size, k)) < MUTATION_RATE
+            delta = self._rng.uniform(-MUTATION_MAG, MUTATION_MAG, (cids.size, k))
+            for c, name in enumerate(GENE_NAMES):
+                col = getattr(self, name)
+                col[cids] = np.clip(col[cids] + mask[:, c]*delta[:, c], 0.0, 1.0)
+            self.recent_mutations += int(mask.any(axis=1).sum())
+            # la mutación pudo tocar rgb o fuerza/movilidad: refrescar caches
+            self.color_u8[cids] = (self.traits[cids, :3]*255).astype(np.uint8)
+            self.step_cost[cids] = 0.2 + 0.5*self.mobility[cids] + 0.3*self.strength[cids]
+
+        # occasional global events
+        if self.tick % 2000 == 0:
+            # small random event: starvation or small meteor
+            if self._rng.random() < 0.5:
+                self.event_log.append(f"{self.tick}: Meteoro - zona afectada")
+                self._meteor_event()
+            else:
+                self.event_log.append(f"{self.tick}: Sequía - energía reducida temporalmente")
+                self._drought_event()
+
+    def _meteor_event(self):
+        # kill random patch: máscara sobre el slice del grid y baja directa
+        # (marcar muertos + devolver los slots al free list, sin list.remove)
+        cx = int(self._rng.integers(self.w)); cy = int(self._rng.integers(self.h))
+        radius = int(self._rng.integers(3, 13))
+        x0, x1 = max(0, cx-radius), min(self.w, cx+radius+1)
+        y0, y1 = max(0, cy-radius), min(self.h, cy+radius+1)
+        region = self.grid[x0:x1, y0:y1]
+        ids = region[region >= 0]
+        self.energy[ids] = -1
+        self.alive[ids] = False
+        self.free.extend(ids.tolist())
+        region[region >= 0] = -1
+        self._mark_dirty(x0, y0)
+        self._mark_dirty(x1 - 1, y1 - 1)
+        self.event_log.append(f"  {ids.size} individuos muertos por meteoro")
+
+    def _step_interactions_gpu(self, order, dead, birth_pos, birth_parents,
+                               birth_energy):
+        # lanza _step_core_gpu con espejos en device y trae el resultado;
+        # con el estado yendo y viniendo por PCIe cada tick, solo compensa
+        # con poblaciones muy por encima del tamaño de mundo por defecto
+        if self._gpu_rng is None:
+            seed = int(self._rng.integers(1 << 62))
+            self._gpu_rng = create_xoroshiro128p_states(self.max_agents, seed=seed)
+        d_grid = cuda.to_device(self.grid)
+        d_x = cuda.to_device(self.x)
+        d_y = cuda.to_device(self.y)
+        d_traits = cuda.to_device(self.traits)
+        d_rgb_norm = cuda.to_device(self.rgb_norm)
+        d_age = cuda.to_device(self.age)
+        d_dead = cuda.to_device(dead)
+        d_order = cuda.to_device(order.astype(np.int32))
+        d_birth_pos = cuda.to_device(birth_pos)
+        d_birth_parents = cuda.to_device(birth_parents)
+        d_birth_energy = cuda.to_device(birth_energy)
+        d_birth_count = cuda.to_device(np.zeros(1, dtype=np.int32))
+        tpb = 128
+        blocks = (order.size + tpb - 1) // tpb
+        _step_core_gpu[blocks, tpb](d_grid, d_x, d_y, d_rgb_norm, d_traits,
+                                    d_age, d_order, d_dead, d_birth_pos,
+                                    d_birth_parents, d_birth_energy,
+                                    d_birth_count, self._gpu_rng)
+        d_grid.copy_to_host(self.grid)
+        d_x.copy_to_host(self.x)
+        d_y.copy_to_host(self.y)
+        d_traits.copy_to_host(self.traits)
+        d_dead.copy_to_host(dead)
+        d_birth_pos.copy_to_host(birth_pos)
+        d_birth_parents.copy_to_host(birth_parents)
+        d_birth_energy.copy_to_host(birth_energy)
+        # sin tracking fino de celdas desde el device: marcar todo sucio
+        self._dirty[:] = (0, 0, self.w - 1, self.h - 1)
+        return min(int(d_birth_count.copy_to_host()[0]), birth_pos.shape[0])
+
+    def _drought_event(self):
+        # reduce everyone's energy a bit
+        ids = np.flatnonzero(self.alive)
+        self.energy[ids] -= self._rng.uniform(5, 20, ids.size)
+
+    def count_species_by_color(self, bucket=8):
+        # bucketize colors to find dominant tones: clave empaquetada en un
+        # int por agente + np.bincount, sin Counter ni tuplas
+        ids = np.flatnonzero(self.alive)
+        if ids.size == 0: return None,0
+        base = bucket + 1  # r==1.0 cae en el bucket extra
+        keys = ((self.r[ids]*bucket).astype(np.int32)*base
+                + (self.g[ids]*bucket).astype(np.int32))*base \
+               + (self.b[ids]*bucket).astype(np.int32)
+        counts = np.bincount(keys, minlength=base**3)
+        k = int(counts.argmax())
+        kr, rem = divmod(k, base*base)
+        kg, kb = divmod(rem, base)
+        # approximate color back
+        denom = bucket-1 if bucket>1 else 1
+        return (int(kr*255/denom), int(kg*255/denom), int(kb*255/denom)), int(counts[k])
+
+# ========== Interaction functions ==========
+@njit(inline='always', fastmath=True, cache=True)
+def color_similarity(rgb_norm, i, j):
+    # cosine similarity: los vectores ya vienen normalizados, solo dot
+    sim = (rgb_norm[i, 0]*rgb_norm[j, 0] + rgb_norm[i, 1]*rgb_norm[j, 1]
+           + rgb_norm[i, 2]*rgb_norm[j, 2])
+    return min(max(sim, 0.0), 1.0)
+
+@njit(inline='always', fastmath=True, cache=True)
+def fight(strength, energy, i, j):
+    # returns True if 'i' wins against 'j'
+    score_i = strength[i]*1.5 + (energy[i] / (BASE_ENERGY*1.5))
+    score_j = strength[j]*1.5 + (energy[j] / (BASE_ENERGY*1.5))
+    prob_i = score_i / (score_i + score_j + 1e-9)
+    # small randomness
+    return np.random.random() < prob_i
+
+@njit(inline='always', cache=True)
+def _mark_dirty_cell(dirty, cx, cy):
+    if cx < dirty[0]: dirty[0] = cx
+    if cy < dirty[1]: dirty[1] = cy
+    if cx > dirty[2]: dirty[2] = cx
+    if cy > dirty[3]: dirty[3] = cy
+
+@njit(cache=True)
+def step_core(grid, x, y, rgb_norm, strength, mobility, cooperation, give_way,
+              energy, age, order, dead, birth_pos, birth_parents, birth_energy,
+              dirty):
+    """Loop de interacción de un tick, compilado. Las muertes se marcan en
+    `dead` y los nacimientos se anotan en los buffers birth_*; los aplica
+    World.step en Python después. Devuelve el nº de nacimientos."""
+    w, h = grid.shape
+    nb = 0
+    for oi in range(order.size):
+        i = order[oi]
+        # Skip agents that may have died earlier in this tick
+        if energy[i] <= 0:
+            dead[i] = True
+            continue
+
+        # Decide whether to move
+        if np.random.random() < mobility[i]:
+            # choose a target neighbor (including staying chance)
+            k = int(np.random.random() * 9)
+            tx = x[i] + DX[k]; ty = y[i] + DY[k]
+            if k == 0:
+                pass
+            elif tx < 0 or tx >= w or ty < 0 or ty >= h:
+                pass
+            else:
+                j = grid[tx, ty]
+                if j < 0:
+                    # move
+                    grid[x[i], y[i]] = -1
+                    _mark_dirty_cell(dirty, x[i], y[i])
+                    x[i] = tx; y[i] = ty
+                    grid[tx, ty] = i
+                    _mark_dirty_cell(dirty, tx, ty)
+                    energy[i] -= MOVE_COST
+                else:
+                    # interaction: decide give way or fight or reproduce
+                    if np.random.random() < give_way[i]:
+                        # agent gives way: stays and loses small energy
+                        energy[i] -= 0.5
+                    elif np.random.random() < give_way[j]:
+                        # occupant gives way -> occupant moves away if possible
+                        moved = False
+                        for k2 in range(1, 9):
+                            nx = x[j] + DX[k2]; ny = y[j] + DY[k2]
+                            if 0 <= nx < w and 0 <= ny < h and grid[nx, ny] < 0:
+                                grid[x[j], y[j]] = -1
+                                _mark_dirty_cell(dirty, x[j], y[j])
+                                x[j] = nx; y[j] = ny
+                                grid[nx, ny] = j
+                                _mark_dirty_cell(dirty, nx, ny)
+                                moved = True
+                                break
+                        # now move agent into freed cell if freed
+                        if moved and grid[tx, ty] < 0:
+                            grid[x[i], y[i]] = -1
+                            _mark_dirty_cell(dirty, x[i], y[i])
+                            x[i] = tx; y[i] = ty
+                            grid[tx, ty] = i
+                            _mark_dirty_cell(dirty, tx, ty)
+                            energy[i] -= MOVE_COST
+                    else:
+                        # fight or reproduce depending on cooperation and compatibility
+                        compat = color_similarity(rgb_norm, i, j)
+                        if np.random.random() < cooperation[i]*cooperation[j]*compat:
+                            # reproduce (create child in a nearby empty cell if possible)
+                            ex = -1; ey = -1
+                            for k2 in range(1, 9):
+                                nx = x[i] + DX[k2]; ny = y[i] + DY[k2]
+                                if 0 <= nx < w and 0 <= ny < h and grid[nx, ny] < 0:
+                                    ex = nx; ey = ny
+                                    break
+                            if ex >= 0 and nb < birth_pos.shape[0]:
+                                birth_pos[nb, 0] = ex; birth_pos[nb, 1] = ey
+                                birth_parents[nb, 0] = i; birth_parents[nb, 1] = j
+                                birth_energy[nb] = (energy[i] + energy[j]) * 0.15
+                                nb += 1
+                                energy[i] -= REPRODUCE_COST
+                                energy[j] -= REPRODUCE_COST/1.5
+                            else:
+                                # no space -> fight instead
+                                if fight(strength, energy, i, j):
+                                    # agent wins -> occupant dies
+                                    dead[j] = True
+                                    energy[i] += ENERGY_GAIN_ON_KILL
+                                else:
+                                    dead[i] = True
+                        else:
+                            # fight: chance proportional to strength + energy
+                            if fight(strength, energy, i, j):
+                                dead[j] = True
+                                energy[i] += ENERGY_GAIN_ON_KILL
+                            else:
+                                dead[i] = True
+
+        # death by age (optional)
+        if age[i] > MAX_AGE:
+            dead[i] = True
+    return nb
+
+if _HAS_CUDA:
+    @cuda.jit(device=True)
+    def _fight_gpu(traits, i, j, rng_states, t):
+        score_i = traits[i, STR]*1.5 + (traits[i, ENE] / (BASE_ENERGY*1.5))
+        score_j = traits[j, STR]*1.5 + (traits[j, ENE] / (BASE_ENERGY*1.5))
+        prob_i = score_i / (score_i + score_j + 1e-9)
+        return xoroshiro128p_uniform_float32(rng_states, t) < prob_i
+
+    @cuda.jit
+    def _step_core_gpu(grid, x, y, rgb_norm, traits, age, order, dead,
+                       birth_pos, birth_parents, birth_energy, birth_count,
+                       rng_states):
+        """Versión data-parallel de step_core: un thread por agente del tick.
+        El orden secuencial se sustituye por claims atómicos de celda
+        (atomic.cas sobre el grid) y la energía ajena se toca con atomic.add.
+        Aproximación deliberada: el ocupante que cede el paso no se desplaza
+        (esa rama encadenaría dos claims) y las peleas leen la energía del
+        rival sin bloquear."""
+        t = cuda.grid(1)
+        if t >= order.size:
+            return
+        i = order[t]
+        if traits[i, ENE] <= 0:
+            dead[i] = True
+            return
+        w, h = grid.shape
+        if xoroshiro128p_uniform_float32(rng_states, t) < traits[i, MOB]:
+            k = int(xoroshiro128p_uniform_float32(rng_states, t) * 9)
+            tx = x[i] + DX[k]; ty = y[i] + DY[k]
+            if k != 0 and 0 <= tx < w and 0 <= ty < h:
+                j = cuda.atomic.cas(grid, (tx, ty), -1, i)
+                if j < 0:
+                    # celda libre reclamada: mover (la vieja es nuestra)
+                    grid[x[i], y[i]] = -1
+                    x[i] = tx; y[i] = ty
+                    traits[i, ENE] -= MOVE_COST
+                else:
+                    if xoroshiro128p_uniform_float32(rng_states, t) < traits[i, GIV]:
+                        traits[i, ENE] -= 0.5
+                    elif xoroshiro128p_uniform_float32(rng_states, t) < traits[j, GIV]:
+                        pass  # ver docstring: sin desalojo del ocupante
+                    else:
+                        compat = (rgb_norm[i, 0]*rgb_norm[j, 0]
+                                  + rgb_norm[i, 1]*rgb_norm[j, 1]
+                                  + rgb_norm[i, 2]*rgb_norm[j, 2])
+                        compat = min(max(compat, 0.0), 1.0)
+                        roll = xoroshiro128p_uniform_float32(rng_states, t)
+                        if roll < traits[i, COOP]*traits[j, COOP]*compat:
+                            ex = -1; ey = -1
+                            for k2 in range(1, 9):
+                                nx = x[i] + DX[k2]; ny = y[i] + DY[k2]
+                                if 0 <= nx < w and 0 <= ny < h and grid[nx, ny] < 0:
+                                    ex = nx; ey = ny
+                                    break
+                            nb = -1
+                            if ex >= 0:
+                                nb = cuda.atomic.add(birth_count, 0, 1)
+                            if 0 <= nb < birth_pos.shape[0]:
+                                birth_pos[nb, 0] = ex; birth_pos[nb, 1] = ey
+                                birth_parents[nb, 0] = i; birth_parents[nb, 1] = j
+                                birth_energy[nb] = (traits[i, ENE] + traits[j, ENE]) * 0.15
+                                traits[i, ENE] -= REPRODUCE_COST
+                                cuda.atomic.add(traits, (j, ENE), -REPRODUCE_COST/1.5)
+                            elif _fight_gpu(traits, i, j, rng_states, t):
+                                dead[j] = True
+                                traits[i, ENE] += ENERGY_GAIN_ON_KILL
+                            else:
+                                dead[i] = True
+                        else:
+                            if _fight_gpu(traits, i, j, rng_states, t):
+                                dead[j] = True
+                                traits[i, ENE] += ENERGY_GAIN_ON_KILL
+                            else:
+                                dead[i] = True
+        if age[i] > MAX_AGE:
+            dead[i] = True
+
+def mix_genome(world, i, j):
+    # child genome as averages: media de las dos filas empaquetadas
+    return 0.5*(world.traits[i, :ENE] + world.traits[j, :ENE])
+
+# ========== Rendering / UI ==========
+def draw_world(screen, world):
+    # draw agents: la imagen (w,h,3) sale entera de las columnas SoA y se
+    # sube con un solo blit_array + scale, en vez de miles de screen.fill
+    img = getattr(world, "_img", None)
+    if img is None or img.shape[:2] != (world.w, world.h):
+        img = world._img = np.zeros((world.w, world.h, 3), dtype=np.uint8)
+        world._cell_surf = pygame.Surface((world.w, world.h))
+        world._scaled_surf = pygame.Surface((world.w*CELL_SIZE, world.h*CELL_SIZE))
+    img[:] = (8, 8, 9)  # background
+    alive = world.grid >= 0
+    img[alive] = world.color_u8[world.grid[alive]]
+    pygame.surfarray.blit_array(world._cell_surf, img)
+    pygame.transform.scale(world._cell_surf,
+                           (world.w*CELL_SIZE, world.h*CELL_SIZE),
+                           world._scaled_surf)
+    screen.blit(world._scaled_surf, (0, 0))
+
+# regiones fijas de UI, para display.update parcial
+OVERLAY_RECT = (8, 8, 320, 140)
+BOTTOM_RECT = (0, WINDOW_H - 70, WINDOW_W, 70)   # eventos + footer
+
+# caches del overlay: solo re-renderizamos texto cuando cambia su contenido
+_overlay_cache = {"key": None, "surf": None}
+_events_cache = {"key": None, "surfs": []}
+
+def draw_overlay(screen, world, font, paused, speed, show_detailed):
+    # stats box (cacheada: font.render solo cuando cambia el estado)
+    key = (world.tick, int(world.alive.sum()), paused, speed, show_detailed)
+    if key != _overlay_cache["key"]:
+        _overlay_cache["key"] = key
+        _render_overlay(world, font, paused, speed, show_detailed)
+    screen.blit(_overlay_cache["surf"], (8,8))
+    # events on bottom-left (idem, cambian muy de vez en cuando)
+    small = font
+    if len(world.event_log) != _events_cache["key"]:
+        _events_cache["key"] = len(world.event_log)
+        _events_cache["surfs"] = [small.render(e, True, (220,200,200))
+                                  for e in world.event_log[-4:]]
+    e_y = WINDOW_H - 64
+    for ev_surf in _events_cache["surfs"]:
+        screen.blit(ev_surf, (10, e_y))
+        e_y += 16
+
+def _render_overlay(world, font, paused, speed, show_detailed):
+    surf = _overlay_cache["surf"]
+    if surf is None:
+        surf = _overlay_cache["surf"] = pygame.Surface((320, 140), pygame.SRCALPHA)
+    surf.fill((20,20,20,200))
+    small = font
+    ids = np.flatnonzero(world.alive)
+    lines = []
+    lines.append(f"Tick: {world.tick}   Agents: {ids.size}  Speed: {speed}x")
+    dom_color, dom_count = world.count_species_by_color()
+    if dom_color:
+        lines.append(f"Dominant color count: {dom_count}")
+    else:
+        lines.append("Dominant color: -")
+    # averages: una reducción C por columna en vez de pasadas en Python
+    if ids.size:
+        avg_str = float(world.strength[ids].mean())
+        avg_mob = float(world.mobility[ids].mean())
+        avg_coop= float(world.cooperation[ids].mean())
+    else:
+        avg_str=avg_mob=avg_coop=0
+    lines.append(f"Avg strength: {avg_str:.2f}  mobility: {avg_mob:.2f}")
+    lines.append(f"Avg cooperation: {avg_coop:.2f}  recent mutations: {world.recent_mutations}")
+    if paused:
+        lines.append("PAUSED (SPACE to resume)")
+    else:
+        lines.append("Running (SPACE to pause)")
+    if show_detailed and ids.size:
+        # top species colors histogram (bucket), con claves empaquetadas
+        b = 6
+        keys = ((world.r[ids]*b).astype(np.int32)*(b+1)*(b+1)
+                + (world.g[ids]*b).astype(np.int32)*(b+1)
+                + (world.b[ids]*b).astype(np.int32))
+        uniq, counts = np.unique(keys, return_counts=True)
+        top = np.argsort(counts)[::-1][:5]
+        for k, c in zip(uniq[top], counts[top]):
+            # decode approx color
+            kr, kg, kb = k // ((b+1)*(b+1)), (k // (b+1)) % (b+1), k % (b+1)
+            col = (int(kr*255/6), int(kg*255/6), int(kb*255/6))
+            lines.append(f"color {col} : {c}")
+    # render lines
+    y = 12
+    for L in lines:
+        surf_text = small.render(L, True, (230,230,230))
+        surf.blit(surf_text, (4, 4 + y))
+        y += 18
+    # draw dominant color box
+    if dom_color:
+        pygame.draw.rect(surf, dom_color, pygame.Rect(320-36, 12, 28, 28))
+
+# ========== Main ==========
+def main():
+    pygame.init()
+    # SCALED+DOUBLEBUF: render a la resolución lógica y que SDL2 estire por
+    # GPU, con flip sincronizado al vsync (HWSURFACE ya no hace nada en SDL2)
+    screen = pygame.display.set_mode((GRID_W*CELL_SIZE, GRID_H*CELL_SIZE),
+                                     pygame.SCALED | pygame.DOUBLEBUF, vsync=1)
+    pygame.display.set_caption("PixelLife Evolution Simulator")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont("consolas", 14)
+    # texto estático: renderizado una sola vez fuera del loop
+    footer = font.render("SPACE pause | R reset | S screenshot | +/- speed | M toggle details", True, (120,120,120))
+
+    world = World(GRID_W, GRID_H)
+    paused = False
+    speed = 1
+    show_detailed = False
+
+    last_screenshot = 0
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_r:
+                    world = World(GRID_W, GRID_H)
+                elif event.key == pygame.K_s:
+                    # screenshot
+                    fname = f"pixellife_screenshot_{int(time.time())}.png"
+                    pygame.image.save(screen, fname)
+                    last_screenshot = time.time()
+                    print(f"Saved screenshot: {fname}")
+                elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
+                    speed = min(8, speed+1)
+                elif event.key == pygame.K_MINUS:
+                    speed = max(1, speed-1)
+                elif event.key == pygame.K_m:
+                    show_detailed = not show_detailed
+        if not paused:
+            for _ in range(speed):
+                world.step()
+
+        # la imagen del mundo ya lleva el fondo oscuro, no hace falta fill
+        draw_world(screen, world)
+        draw_overlay(screen, world, font, paused, speed, show_detailed)
+
+        # small footer
+        screen.blit(footer, (8, WINDOW_H-22))
+
+        # dirty rects: si cambió poca superficie, solo subimos esas regiones
+        dirty = world.consume_dirty()
+        if dirty is None:
+            pygame.display.update([OVERLAY_RECT, BOTTOM_RECT])
+        else:
+            x0, y0, x1, y1 = dirty
+            rect = (x0*CELL_SIZE, y0*CELL_SIZE,
+                    (x1 - x0 + 1)*CELL_SIZE, (y1 - y0 + 1)*CELL_SIZE)
+            if rect[2]*rect[3] < 0.25 * WINDOW_W * WINDOW_H:
+                pygame.display.update([rect, OVERLAY_RECT, BOTTOM_RECT])
+            else:
+                pygame.display.flip()
+        clock.tick(FPS)
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()